@@ -3,10 +3,13 @@ from __future__ import annotations
 import asyncio
 from enum import Enum
 from functools import partial
+import random
 import typing as t
 
+import aiohttp
 from aiohttp import ClientResponse, ClientSession
 import attr
+import orjson
 
 from pixels import exceptions as e
 from pixels import pixel
@@ -29,15 +32,47 @@ class Endpoint(Enum):
 _Method = t.Literal["get", "post"]
 
 
+_MAX_RETRIES = 5
+_BACKOFF_BASE = 1
+_BACKOFF_CAP = 60
+_BACKOFF_JITTER = 1
+
+
 class Client:
-    def __init__(self, api_key: str) -> None:
-        self._api_key = api_key
-        self._session: t.Optional[ClientSession] = None
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        session: t.Optional[ClientSession] = None,
+        connector: t.Optional[aiohttp.BaseConnector] = None,
+        timeout: t.Optional[aiohttp.ClientTimeout] = None,
+    ) -> None:
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+        self._connector = connector
+        self._timeout = timeout
+        self._session = session
+        self._owns_session = session is None
         self.limiter = Limiter()
 
     def _create_session(self) -> None:
         if self._session is None:
-            self._session = ClientSession()
+            connector = self._connector
+            if connector is None:
+                connector = aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=32,
+                    keepalive_timeout=75,
+                    ttl_dns_cache=300,
+                    enable_cleanup_closed=True,
+                )
+            timeout = self._timeout
+            if timeout is None:
+                timeout = aiohttp.ClientTimeout(total=30, connect=10)
+            self._session = ClientSession(
+                connector=connector,
+                connector_owner=self._connector is None,
+                timeout=timeout,
+            )
 
     @property
     def session(self) -> ClientSession:
@@ -53,7 +88,7 @@ class Client:
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback) -> None:  # noqa: ANN001
-        if self._session is None:
+        if self._session is None or not self._owns_session:
             return
         await self._session.close()
         self._session = None
@@ -65,33 +100,49 @@ class Client:
         decode: t.Callable[[ClientResponse], t.Awaitable[T]],
         *,
         json: t.Mapping = None,
-        params: t.Mapping[str, str] = None,
+        params: t.Sequence[tuple[str, t.Any]] = None,
     ) -> T:
         logger.debug(
             f"{endpoint.name} {json} {params}"
         )
-        _headers = {"Authorization": f"Bearer {self._api_key}"}
-        while True:
+        for attempt in range(_MAX_RETRIES + 1):
             request = self.session.request(
                 method,
                 endpoint.value,
                 params=params,
                 json=json,
-                headers=_headers,
+                headers=self._headers,
             )
             async with request as response:
+                status = response.status
                 cooldown = self.limiter.consume_headers(endpoint, response.headers)
-                if cooldown is not None:
-                    logger.warning(
-                        f"{endpoint.name} You are being rate limited!"
-                        "Waiting {cooldown} seconds."
-                    )
-                    await asyncio.sleep(cooldown)
-                if response.status >= 500:
+                if status >= 500:
                     raise e.FatalGatewayError("server panic!")
-                elif 400 <= response.status < 500:
-                    raise e.GatewayError(response.status, await response.text())
-                return await decode(response)
+                elif status == 429:
+                    body = await response.text()
+                elif status >= 400:
+                    raise e.GatewayError(status, await response.text())
+                else:
+                    result = await decode(response)
+            if status == 429:
+                if attempt == _MAX_RETRIES:
+                    raise e.GatewayError(status, body)
+                delay = cooldown
+                if delay is None:
+                    delay = min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt)
+                delay += random.uniform(0, _BACKOFF_JITTER)
+                logger.warning(
+                    f"{endpoint.name} You are being rate limited! "
+                    f"Waiting {delay:.2f} seconds."
+                )
+                await asyncio.sleep(delay)
+                continue
+            if cooldown is not None:
+                logger.warning(
+                    f"{endpoint.name} Cooling down for {cooldown} seconds."
+                )
+                await asyncio.sleep(cooldown + random.uniform(0, _BACKOFF_JITTER))
+            return result
 
     async def get_pixels(self, size: pixel.CanvasSize) -> pixel.Canvas:
         _decode = partial(pixel._decode_canvas, size)
@@ -106,9 +157,20 @@ class Client:
             Endpoint.GET_PIXEL,
             "get",
             pixel._decode_pixel,
-            params={"x": str(x), "y": str(y)},
+            params=(("x", x), ("y", y)),
         )
 
+    async def get_pixels_many(
+        self, coords: t.Iterable[tuple[int, int]], concurrency: int = 16
+    ) -> list[pixel.Pixel]:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(x: int, y: int) -> pixel.Pixel:
+            async with sem:
+                return await self.get_pixel(x, y)
+
+        return await asyncio.gather(*(one(x, y) for x, y in coords))
+
     async def get_size(self) -> pixel.CanvasSize:
         return await self._request(Endpoint.GET_SIZE, "get", pixel._decode_canvas_size)
 
@@ -117,15 +179,34 @@ class Client:
             Endpoint.SET_PIXEL, "post", _set_pixel_decode, json=pxl.to_json()
         )
 
+    async def set_pixels(
+        self, pxls: t.Iterable[pixel.Pixel], concurrency: int = 16
+    ) -> list[str]:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(pxl: pixel.Pixel) -> str:
+            async with sem:
+                return await self.set_pixel(pxl)
+
+        return await asyncio.gather(*(one(pxl) for pxl in pxls))
+
 
 async def _set_pixel_decode(r: ClientResponse) -> str:
-    m = await r.json()
+    m = await r.json(loads=orjson.loads)
     return m["message"]
 
 
 Cls = t.TypeVar("Cls")
 
 
+_COOLDOWN_KEY = "Cooldown-Reset"
+_ACTIVE_KEYS = (
+    "Requests-Remaining",
+    "Requests-Limit",
+    "Requests-Reset",
+)
+
+
 class Limits(t.Protocol):
     @property
     def cooldown(self) -> t.Optional[int]:
@@ -136,7 +217,7 @@ class Limits(t.Protocol):
         ...
 
 
-@attr.s
+@attr.s(slots=True)
 class Active:
     remaining: int = attr.ib(converter=int)
     limit: int = attr.ib(converter=int)
@@ -150,17 +231,12 @@ class Active:
 
     @classmethod
     def from_json(cls, m: t.Mapping) -> Active:
-        markers = (
-            "Requests-Remaining",
-            "Requests-Limit",
-            "Requests-Reset",
-        )
-        if any(marker not in m for marker in markers):
+        if any(marker not in m for marker in _ACTIVE_KEYS):
             raise ValueError("endpoint does not have limits")
-        return Active(*(m[marker] for marker in markers))
+        return Active(*(m[marker] for marker in _ACTIVE_KEYS))
 
 
-@attr.s
+@attr.s(slots=True)
 class Inactive:
     _cooldown: int = attr.ib(converter=int)
 
@@ -170,23 +246,21 @@ class Inactive:
 
     @classmethod
     def from_json(cls, m: t.Mapping) -> Inactive:
-        return Inactive(m["Cooldown-Reset"])
+        return Inactive(m[_COOLDOWN_KEY])
 
 
-@attr.s
+@attr.s(slots=True)
 class Limiter:
     limits: dict[Endpoint, Limits] = attr.ib(factory=dict)
 
     def consume_headers(
         self, endpoint: Endpoint, headers: t.Mapping
     ) -> t.Optional[int]:
-        for _class in Inactive, Active:
-            try:
-                limits = t.cast(t.Type[Limits], _class).from_json(headers)
-            except (ValueError, KeyError):
-                continue
-            else:
-                self.limits[endpoint] = limits
-                return limits.cooldown
+        if _COOLDOWN_KEY in headers:
+            limits: Limits = Inactive.from_json(headers)
+        elif _ACTIVE_KEYS[0] in headers:
+            limits = Active.from_json(headers)
         else:
             return None
+        self.limits[endpoint] = limits
+        return limits.cooldown
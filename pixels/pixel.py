@@ -1,18 +1,14 @@
 from __future__ import annotations
 
-import itertools
-import re
 import typing as t
 
 from aiohttp import ClientResponse
 import attr
+import orjson
 from PIL import Image as PIL_Image  # type: ignore
 from PIL.Image import Image  # type: ignore
 
 
-_HEX_PATTERN = "#?" + "([A-Za-z0-9]{2})" * 3
-
-
 def _from_hex(hxt: t.Union[str, int]) -> int:
     if isinstance(hxt, str):
         return int(hxt, base=16)
@@ -26,19 +22,27 @@ class RGB:
     g: int = attr.ib(converter=_from_hex)
     b: int = attr.ib(converter=_from_hex)
 
+    @classmethod
+    def _from_ints(cls, r: int, g: int, b: int) -> RGB:
+        rgb = cls.__new__(cls)
+        object.__setattr__(rgb, "r", r)
+        object.__setattr__(rgb, "g", g)
+        object.__setattr__(rgb, "b", b)
+        return rgb
+
     def as_hex_string(self) -> str:
-        return f"{self.r:02x}{self.g:02x}{self.b:02x}"
+        return bytes((self.r, self.g, self.b)).hex()
 
     @classmethod
     def from_hex_string(cls, hxt: str) -> RGB:
-        err = ValueError(f"invalid hex string {hxt}")
-        _match = re.match(_HEX_PATTERN, hxt)
-        if _match is None:
-            raise err
+        _hex = hxt[1:] if hxt.startswith("#") else hxt
+        if len(_hex) != 6:
+            raise ValueError(f"invalid hex string {hxt}")
         try:
-            return RGB(*_match.groups())
+            r, g, b = bytes.fromhex(_hex)
         except ValueError:
-            raise err from None
+            raise ValueError(f"invalid hex string {hxt}") from None
+        return RGB._from_ints(r, g, b)
 
 
 @attr.s(frozen=True, slots=True)
@@ -73,42 +77,47 @@ class CanvasSize:
         return CanvasSize(m["width"], m["height"])
 
 
-def chunks_of(i: t.Iterable, n: int) -> t.Iterable:
-    args = [iter(i)] * n
-    return zip(*args)
-
-
 @attr.s
 class Canvas:
     size: CanvasSize = attr.ib()
-    _canvas: dict[tuple[int, int], RGB] = attr.ib(factory=dict)
+    _pixels: bytes = attr.ib()
 
     def __getitem__(self, index: tuple[int, int]) -> RGB:
-        return self._canvas[index]
+        x, y = index
+        if not (0 <= x < self.size.width and 0 <= y < self.size.height):
+            raise KeyError(index)
+        offset = 3 * (y * self.size.width + x)
+        return RGB._from_ints(*self._pixels[offset:offset + 3])
 
     @classmethod
     def from_bytes(cls, size: CanvasSize, stream: bytes) -> Canvas:
-        _canvas = {}
-        chunks = iter(chunks_of(stream, 3))
-        for y, x in itertools.product(range(size.height), range(size.width)):
-            _canvas[x, y] = RGB(*next(chunks))
-        return Canvas(size, _canvas)
+        _pixels = bytes(stream)
+        if len(_pixels) != 3 * size.width * size.height:
+            raise ValueError(
+                f"expected {3 * size.width * size.height} bytes, "
+                f"got {len(_pixels)}"
+            )
+        return Canvas(size, _pixels)
 
     def to_image(self) -> Image:
-        image = PIL_Image.new("RGB", attr.astuple(self.size), "black")
-
-        image.putdata([attr.astuple(rgb) for rgb in self._canvas.values()])
-
-        return image
+        return PIL_Image.frombytes(
+            "RGB", (self.size.width, self.size.height), self._pixels
+        )
 
 
 async def _decode_pixel(response: ClientResponse) -> Pixel:
-    return Pixel.from_json(await response.json())
+    return Pixel.from_json(await response.json(loads=orjson.loads))
 
 
 async def _decode_canvas_size(response: ClientResponse) -> CanvasSize:
-    return CanvasSize.from_json(await response.json())
+    return CanvasSize.from_json(await response.json(loads=orjson.loads))
 
 
 async def _decode_canvas(size: CanvasSize, response: ClientResponse) -> Canvas:
-    return Canvas.from_bytes(size, await response.content.read())
+    buffer = bytearray(size.width * size.height * 3)
+    view = memoryview(buffer)
+    offset = 0
+    async for chunk in response.content.iter_chunked(65536):
+        view[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return Canvas.from_bytes(size, buffer)
@@ -1,5 +1,32 @@
+import pytest
+
 from pixels import __version__
+from pixels.pixel import Canvas, CanvasSize, RGB
 
 
 def test_version():
     assert __version__ == '0.1.0'
+
+
+def test_rgb_hex_round_trip():
+    rgb = RGB.from_hex_string("#ff00aa")
+    assert rgb == RGB(255, 0, 170)
+    assert rgb.as_hex_string() == "ff00aa"
+    for bad in ("0x1234", "0X1234", "ff 0aa", "gg0000", "ff00aa0"):
+        with pytest.raises(ValueError):
+            RGB.from_hex_string(bad)
+
+
+def test_canvas_from_bytes():
+    size = CanvasSize(2, 2)
+    stream = bytes(range(12))
+    canvas = Canvas.from_bytes(size, stream)
+    assert canvas[0, 0] == RGB(0, 1, 2)
+    assert canvas[1, 0] == RGB(3, 4, 5)
+    assert canvas[0, 1] == RGB(6, 7, 8)
+    assert canvas[1, 1] == RGB(9, 10, 11)
+    for oob in ((2, 0), (0, 5), (-1, 0)):
+        with pytest.raises(KeyError):
+            canvas[oob]
+    with pytest.raises(ValueError):
+        Canvas.from_bytes(size, stream[:-1])